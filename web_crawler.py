@@ -11,158 +11,1228 @@ IMPORTANT - Éthique du crawling:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from collections import deque
+from lxml import etree
+import lxml.html
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+import asyncio
+import codecs
+import hashlib
+import html as html_lib
+import json
+import logging
+import math
+import os
+import pickle
+import queue as queue_lib
+import socket
+import sys
+import threading
 import time
 import re
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp n'est nécessaire que pour crawl_async()
+    aiohttp = None
+
+# Le brotli n'est demandé au serveur que si on sait le décompresser
+try:
+    import brotli
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# Parser HTML de BeautifulSoup (exemples): lxml (C, libxml2) est plusieurs
+# fois plus rapide que 'html.parser' (pur Python) sur des pages réelles
+HTML_PARSER = 'lxml'
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Filtres de liens compilés une seule fois
+_SCHEME_RE = re.compile(r'[a-zA-Z][a-zA-Z0-9+.\-]*:')
+_SKIPPED_HREF_RE = re.compile(r'\s*(?:#|javascript:|mailto:|tel:)', re.IGNORECASE)
+_WS_RE = re.compile(r'\s+')
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+# _BIT_UNSET[bit]: les octets dont le bit `bit` vaut 0, à supprimer avec
+# bytes.translate() pour compter les bits de simhash() en C
+_BIT_UNSET = [bytes(value for value in range(256) if not value >> bit & 1) for bit in range(8)]
+
+# Les pages sont lues par morceaux et abandonnées au-delà de MAX_PAGE_BYTES
+CHUNK_SIZE = 64 * 1024
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+# Fichier de sortie JSONL vidé sur le disque toutes les FLUSH_EVERY pages
+FLUSH_EVERY = 100
+
+# Une ligne de progression toutes les PROGRESS_EVERY pages (le détail de
+# chaque page est au niveau DEBUG)
+PROGRESS_EVERY = 100
+
+# Réponses 429 (Too Many Requests) et 503 (Service Unavailable): la
+# requête est retentée jusqu'à MAX_RETRIES fois, après Retry-After ou un
+# délai qui double à chaque échec (BACKOFF_BASE, 2 x BACKOFF_BASE, ...).
+# Aucune attente ne dépasse MAX_BACKOFF, même si le serveur en demande plus
+RETRY_STATUSES = frozenset({429, 503})
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 60.0
+
+logger = logging.getLogger('crawler')
+
+
+class PageTooLargeError(Exception):
+    """La page dépasse MAX_PAGE_BYTES"""
+
+
+class RateLimitedError(Exception):
+    """Le serveur demande d'attendre plus de MAX_BACKOFF secondes avant de réessayer"""
+
+
+def canonicalize_url(url):
+    """Forme canonique d'une URL, utilisée pour détecter les doublons
+    
+    Hôte en minuscules, fragment (#...) supprimé, paramètres de requête
+    triés et port par défaut (:80 / :443) retiré.
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    netloc = parsed.hostname or ''
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parsed.port}"
+    if parsed.username or parsed.password:
+        netloc = f"{parsed.netloc.rsplit('@', 1)[0]}@{netloc}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, query, ''))
+
+
+def _fast_join(base_url, base_scheme, base_origin, href):
+    """urljoin() simplifié pour les cas les plus courants
+    
+    Les URLs absolues, `//hôte/...` et `/chemin` sont construites par simple
+    concaténation; le reste (chemins relatifs, `..`) passe par urljoin().
+    """
+    if href.startswith(('http://', 'https://')):
+        return href
+    if href.startswith('/') and '/.' not in href:
+        if href.startswith('//'):
+            return f"{base_scheme}:{href}"
+        return base_origin + href
+    return urljoin(base_url, href)
+
+
+def url_hash(url):
+    """Empreinte 64 bits de la forme canonique d'une URL
+    
+    Un int occupe bien moins de mémoire qu'une longue chaîne et se hache
+    plus vite: utilisé pour l'ensemble des pages visitées.
+    """
+    digest = hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def resolve_host(parsed_url):
+    """Résout le nom d'hôte d'une URL (IPv4 de préférence), None en cas d'échec"""
+    if not parsed_url.hostname:
+        return None
+    port = parsed_url.port or DEFAULT_PORTS.get(parsed_url.scheme)
+    try:
+        addresses = socket.getaddrinfo(parsed_url.hostname, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        return None
+    addresses.sort(key=lambda address: address[0] != socket.AF_INET)
+    return addresses[0][4][0] if addresses else None
+
+
+def detect_encoding(content, content_type=None):
+    """Encodage d'une page, sans détection statistique (chardet)
+    
+    Ordre: charset de l'en-tête Content-Type, puis <meta charset> dans le
+    début de la page, sinon UTF-8.
+    """
+    match = _HEADER_CHARSET_RE.search(content_type or '') or _META_CHARSET_RE.search(content[:2048])
+    if match:
+        encoding = match.group(1)
+        if isinstance(encoding, bytes):
+            encoding = encoding.decode('ascii')
+        try:
+            info = codecs.lookup(encoding)
+            # codecs.lookup() accepte aussi hex, base64, zlib, idna...: seuls les
+            # encodages de texte qui savent remplacer les octets invalides sont gardés
+            if info._is_text_encoding:
+                b'<\xe9\xff>'.decode(info.name, 'replace')
+                return info.name
+        except (LookupError, UnicodeError):
+            pass
+    return 'utf-8'
+
+
+def parse_html(content, encoding='utf-8'):
+    """Construit l'arbre lxml d'une page, sans passer par BeautifulSoup
+    
+    Args:
+        content: Contenu brut de la page (bytes)
+        encoding: Encodage renvoyé par detect_encoding()
+    
+    Returns:
+        L'élément racine du document, ou None si la page est vide
+    """
+    try:
+        parser = lxml.html.HTMLParser(encoding=encoding)
+    except LookupError:
+        # Encodage connu de Python mais pas de libxml2: on convertit en UTF-8
+        content = content.decode(encoding, errors='replace').encode('utf-8')
+        parser = lxml.html.HTMLParser(encoding='utf-8')
+    try:
+        return lxml.html.document_fromstring(content, parser=parser)
+    except etree.ParserError:
+        return None
+
+
+@contextmanager
+def console_logging():
+    """Affiche les messages du logger 'crawler' sur la console le temps d'un bloc
+    
+    Les threads du crawler ne font que déposer leurs messages dans une file
+    (QueueHandler): un seul thread (QueueListener) écrit sur la console, ce
+    qui évite d'attendre l'affichage et de mélanger les lignes. En sortie du
+    bloc, les derniers messages sont affichés et le logger est restauré.
+    
+    Ne fait rien si l'application a déjà configuré le logging (handlers sur
+    le logger 'crawler' ou sur le logger racine): les messages lui restent.
+    """
+    if logger.hasHandlers():
+        yield
+        return
+    
+    log_queue = queue_lib.Queue(-1)
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter('%(message)s'))
+    listener = QueueListener(log_queue, console)
+    queue_handler = QueueHandler(log_queue)
+    
+    level, propagate = logger.level, logger.propagate
+    logger.addHandler(queue_handler)
+    if level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+        logger.removeHandler(queue_handler)
+        logger.setLevel(level)
+        logger.propagate = propagate
+
+
+@contextmanager
+def _page_sink(out_path, pages_data):
+    """Destination des pages crawlées: la liste `pages_data`, ou un fichier JSONL
+    
+    Avec un fichier, chaque page est écrite dès qu'elle est traitée (une
+    ligne JSON par page) au lieu de rester en mémoire jusqu'à la fin. Le
+    fichier est ouvert en ajout: un crawl repris complète le fichier existant.
+    
+    Yields:
+        (save, flush): enregistre une page, vide le fichier sur le disque
+    """
+    if out_path is None:
+        yield pages_data.append, lambda: None
+        return
+    
+    with open(out_path, 'a', encoding='utf-8') as f:
+        written = 0
+        
+        def save(record):
+            nonlocal written
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            written += 1
+            if written % FLUSH_EVERY == 0:
+                f.flush()
+        
+        yield save, f.flush
+
+
+def simhash(text, bits=64, shingle_size=4):
+    """Empreinte SimHash d'un texte (None si le texte est vide)
+    
+    Deux textes presque identiques ont des empreintes qui ne diffèrent que
+    de quelques bits (distance de Hamming faible).
+    """
+    words = text.lower().split()
+    if not words:
+        return None
+    
+    # Shingles: groupes de `shingle_size` mots consécutifs (zip() évite de
+    # découper la liste de mots pour chaque shingle)
+    if len(words) < shingle_size:
+        shingles = [' '.join(words)]
+    else:
+        shingles = map(' '.join, zip(*(words[i:] for i in range(shingle_size))))
+    
+    # Toutes les empreintes des shingles mises bout à bout: les bits sont
+    # ensuite comptés octet par octet en C (bytes.translate) au lieu d'une
+    # boucle Python sur les 64 bits de chaque shingle
+    size = bits // 8
+    blake2b = hashlib.blake2b
+    digests = b''.join([
+        blake2b(shingle, digest_size=size).digest()
+        for shingle in map(str.encode, shingles)
+    ])
+    total = len(digests) // size
+    
+    fingerprint = 0
+    for byte in range(size):
+        # Octet `byte` de chaque empreinte (little-endian: bits 8*byte à 8*byte+7)
+        column = digests[byte::size]
+        for bit in range(8):
+            ones = len(column.translate(None, _BIT_UNSET[bit]))
+            # Majorité de 1 parmi les shingles
+            if 2 * ones > total:
+                fingerprint |= 1 << (8 * byte + bit)
+    return fingerprint
 
 
 class SimpleCrawler:
     """Crawler web simple et éducatif"""
     
-    def __init__(self, start_url, max_pages=10, delay=1):
+    def __init__(self, start_url, max_pages=10, delay=1, burst=1, max_workers=4, parse_workers=0,
+                 checkpoint_path=None, checkpoint_every=50):
         """
         Args:
             start_url: URL de départ
             max_pages: Nombre maximum de pages à crawler
-            delay: Délai entre chaque requête (en secondes)
+            delay: Délai moyen entre chaque requête vers un même hôte (en secondes);
+                le serveur peut l'allonger (Retry-After, X-RateLimit-*)
+            burst: Nombre de requêtes qu'un hôte inactif peut recevoir d'affilée
+            max_workers: Nombre de téléchargements simultanés dans crawl()
+            parse_workers: Nombre de processus pour analyser le HTML (0: pas de
+                processus séparés, par exemple os.cpu_count() sur de gros crawls)
+            checkpoint_path: Fichier où sauvegarder l'état du crawl pour pouvoir
+                le reprendre; s'il existe déjà, le crawl reprend là où il s'était arrêté
+            checkpoint_every: Sauvegarde toutes les `checkpoint_every` pages visitées
         """
+        self._log = logger
+        
         self.start_url = start_url
         self.max_pages = max_pages
         self.delay = delay
-        self.visited = set()
+        self.burst = burst
+        self.max_workers = max_workers
+        self.parse_workers = parse_workers
+        self.visited = set()  # url_hash() des pages visitées
         self.to_visit = deque([start_url])
         self.domain = urlparse(start_url).netloc
+        self.parser = PageParser(self.domain)
+        self._parser_pool = None
+        
+        # URLs déjà rencontrées (visitées ou en attente), sous forme canonique:
+        # la deque ne sert plus qu'à l'ordre de visite
+        self.seen = BloomFilter(capacity=1_000_000, error_rate=0.001)
+        self.seen.add(canonicalize_url(start_url))
+        
+        # Empreintes SimHash du texte des pages déjà traitées
+        self.fingerprints = SimhashIndex(max_distance=3)
+        
+        if checkpoint_every < 1:
+            raise ValueError(f"checkpoint_every doit être >= 1 (reçu: {checkpoint_every})")
+        
+        # Reprise d'un crawl interrompu: l'état sauvegardé remplace start_url
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self._load_checkpoint()
         
         # User-Agent poli et identifiable
         self.headers = {
-            'User-Agent': 'EducationalCrawler/1.0 (Educational purposes)'
+            'User-Agent': 'EducationalCrawler/1.0 (Educational purposes)',
+            # Pages compressées: 3 à 5 fois moins d'octets à télécharger
+            'Accept-Encoding': ACCEPT_ENCODING
         }
+        
+        # Session persistante: toutes les URLs partagent le même domaine,
+        # on réutilise donc la même connexion TCP/TLS (keep-alive)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Une connexion par thread de téléchargement, et un domaine résolu
+        # une seule fois (DNS) pour toutes les connexions du pool
+        ip = resolve_host(urlparse(start_url))
+        adapter_options = {'pool_connections': 1, 'pool_maxsize': max(16, max_workers)}
+        if ip:
+            adapter = PinnedDNSAdapter(urlparse(start_url).hostname, ip, **adapter_options)
+        else:
+            adapter = HTTPAdapter(**adapter_options)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # robots.txt mis en cache par hôte, vérifié avant chaque requête
+        self.robots = RobotsTxtChecker(session=self.session)
+        
+        # Débit par hôte (token bucket), ajusté selon les réponses du serveur
+        self.limiter = HostRateLimiter(rate=1 / delay if delay else math.inf, burst=burst)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Ferme la session et libère les connexions du pool"""
+        self.session.close()
     
     def is_valid_url(self, url):
         """Vérifie si l'URL est valide et appartient au même domaine"""
-        parsed = urlparse(url)
-        return (
-            bool(parsed.netloc) and 
-            bool(parsed.scheme) and
-            parsed.netloc == self.domain
-        )
+        return self.parser.is_valid_url(url)
     
     def get_links(self, url, html):
         """Extrait tous les liens d'une page"""
-        soup = BeautifulSoup(html, 'html.parser')
-        links = []
-        
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            # Convertir en URL absolue
-            absolute_url = urljoin(url, href)
-            
-            if self.is_valid_url(absolute_url):
-                links.append(absolute_url)
-        
-        return links
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        return self.parser.extract_links(url, html)
     
     def extract_text(self, html):
         """Extrait le texte principal de la page"""
-        soup = BeautifulSoup(html, 'html.parser')
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        doc = parse_html(html)
+        return self.parser.extract_text(doc) if doc is not None else ''
+    
+    def crawl(self, out_path=None):
+        """Lance le crawling
         
-        # Supprimer scripts et styles
-        for script in soup(['script', 'style']):
-            script.decompose()
+        Les téléchargements tournent dans un pool de `max_workers` threads
+        qui partagent la même session. L'analyse des pages et la mise à jour
+        de la file d'attente restent dans le thread principal: `visited`,
+        `seen` et `to_visit` ne sont jamais modifiés par deux threads (qui
+        est aussi le seul à écrire dans `out_path`).
         
-        # Extraire le texte
-        text = soup.get_text()
-        # Nettoyer les espaces multiples
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
+        Args:
+            out_path: Fichier JSONL où écrire les pages au fur et à mesure
         
-        return text
-    
-    def crawl(self):
-        """Lance le crawling"""
-        print(f"🕷️  Début du crawling de: {self.start_url}")
-        print(f"📊 Limite: {self.max_pages} pages\n")
+        Returns:
+            La liste des pages crawlées (vide si `out_path` est donné)
+        """
+        self._log.info("🕷️  Début du crawling de: %s", self.start_url)
+        self._log.info("📊 Limite: %d pages | %d téléchargements en parallèle\n",
+                       self.max_pages, self.max_workers)
         
         pages_data = []
+        in_flight = {}  # future -> url
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                self._parsing_pool(), _page_sink(out_path, pages_data) as (save, flush):
+            try:
+                while in_flight or (self.to_visit and len(self.visited) < self.max_pages):
+                    # Remplir le pool sans dépasser la limite de pages
+                    while (
+                        self.to_visit
+                        and len(in_flight) < self.max_workers
+                        and len(self.visited) + len(in_flight) < self.max_pages
+                    ):
+                        url = self.to_visit.popleft()
+                        
+                        # Éviter de visiter deux fois la même URL
+                        if url_hash(url) in self.visited:
+                            continue
+                        
+                        if not self.robots.can_fetch(url, self.headers['User-Agent']):
+                            self._log.debug("⛔ Interdit par robots.txt: %s", url)
+                            continue
+                        
+                        self._log.debug("📄 [%d/%d] Crawling: %s",
+                                        len(self.visited) + len(in_flight) + 1, self.max_pages, url)
+                        in_flight[executor.submit(self._download_and_parse, url)] = url
+                    
+                    if not in_flight:
+                        break
+                    
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        # Retirée de in_flight une fois traitée: une interruption
+                        # pendant le traitement la garde dans le checkpoint
+                        url = in_flight[future]
+                        try:
+                            content, parsed = future.result()
+                            
+                            # Marquer comme visitée
+                            self.visited.add(url_hash(url))
+                            
+                            # Sauvegarder les données
+                            record, links = self._process_page(url, content, parsed)
+                            del content
+                            save(record)
+                            
+                            # Ajouter les nouveaux liens à visiter (test en O(1))
+                            for link in links:
+                                canonical = canonicalize_url(link)
+                                if canonical not in self.seen:
+                                    self.seen.add(canonical)
+                                    self.to_visit.append(link)
+                            
+                            if len(self.visited) % self.checkpoint_every == 0:
+                                flush()
+                                self._save_checkpoint(pending=in_flight.values())
+                            
+                            self._log_page(url, record, links)
+                        
+                        except (requests.RequestException, PageTooLargeError, RateLimitedError) as e:
+                            self._log.warning("   ✗ Erreur (%s): %s", url, e)
+                        except Exception as e:
+                            self._log.warning("   ✗ Erreur inattendue (%s): %s", url, e)
+                        del in_flight[future]
+            finally:
+                # Aussi après une interruption (Ctrl-C): les pages déjà écrites
+                # dans out_path ne seront pas crawlées une seconde fois
+                flush()
+                self._save_checkpoint(pending=in_flight.values())
         
-        while self.to_visit and len(self.visited) < self.max_pages:
+        self._log_summary()
+        
+        return pages_data
+    
+    async def crawl_async(self, concurrency=16, workers=None, out_path=None):
+        """Lance le crawling de manière asynchrone (asyncio + aiohttp)
+        
+        Les requêtes sont envoyées en parallèle au lieu d'attendre chaque
+        réponse l'une après l'autre. Le débit reste limité par hôte (voir
+        HostRateLimiter): en moyenne une requête toutes les `delay` secondes.
+        
+        Args:
+            concurrency: Nombre maximum de requêtes en cours simultanément
+            workers: Nombre de coroutines qui consomment la file d'attente
+                (par défaut `concurrency`; moins de workers limite aussi les requêtes)
+            out_path: Fichier JSONL où écrire les pages au fur et à mesure
+        
+        Returns:
+            La liste des pages crawlées (vide si `out_path` est donné)
+        """
+        if aiohttp is None:
+            raise RuntimeError("crawl_async() nécessite aiohttp: pip install aiohttp")
+        
+        if workers is None:
+            workers = concurrency
+        
+        self._log.info("🕷️  Début du crawling asynchrone de: %s", self.start_url)
+        # Chaque worker n'a qu'une requête en cours à la fois
+        self._log.info("📊 Limite: %d pages | %d requêtes en parallèle\n",
+                       self.max_pages, min(concurrency, workers))
+        
+        pages_data = []
+        queue = asyncio.Queue()
+        pending = set()  # URLs dans la file ou en cours (pour les sauvegardes)
+        while self.to_visit:
             url = self.to_visit.popleft()
+            pending.add(url)
+            queue.put_nowait(url)
+        
+        sem = asyncio.Semaphore(concurrency)
+        loop = asyncio.get_running_loop()
+        claimed = len(self.visited)  # pages en cours ou terminées
+        
+        async def download(session, url):
+            """Équivalent asynchrone de _fetch()"""
+            host = urlparse(url).netloc
+            for attempt in range(MAX_RETRIES + 1):
+                await asyncio.sleep(self.limiter.reserve(host))
+                async with sem:
+                    async with session.get(url) as response:
+                        self.limiter.update(host, response.status, response.headers)
+                        if response.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                            self._log.debug("   ↻ %s: status %d, nouvel essai", url, response.status)
+                            continue
+                        response.raise_for_status()
+                        
+                        # Comme _fetch(): refus immédiat si Content-Length dépasse la limite
+                        length = response.content_length
+                        if length is not None and length > MAX_PAGE_BYTES:
+                            raise PageTooLargeError(f"{url} dépasse {MAX_PAGE_BYTES} octets")
+                        
+                        content = bytearray()
+                        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                            content += chunk
+                            if len(content) > MAX_PAGE_BYTES:
+                                raise PageTooLargeError(f"{url} dépasse {MAX_PAGE_BYTES} octets")
+                        return bytes(content), response.headers.get('Content-Type')
+        
+        async def fetch(session, url):
+            nonlocal claimed
+            # Limite atteinte: on garde l'URL en attente sans la visiter
+            key = url_hash(url)
+            if key in self.visited or claimed >= self.max_pages:
+                if key not in self.visited:
+                    self.to_visit.append(url)
+                return
             
-            # Éviter de visiter deux fois la même URL
-            if url in self.visited:
-                continue
+            # robots.txt est téléchargé avec la session synchrone: hors de la boucle
+            allowed = await loop.run_in_executor(
+                None, self.robots.can_fetch, url, self.headers['User-Agent']
+            )
+            if not allowed:
+                self._log.debug("⛔ Interdit par robots.txt: %s", url)
+                return
+            
+            if claimed >= self.max_pages:
+                self.to_visit.append(url)
+                return
+            claimed += 1
+            index = claimed
             
             try:
-                print(f"📄 [{len(self.visited) + 1}/{self.max_pages}] Crawling: {url}")
+                self._log.debug("📄 [%d/%d] Crawling: %s", index, self.max_pages, url)
+                content, content_type = await download(session, url)
                 
-                # Respecter le délai entre les requêtes
-                if self.visited:
-                    time.sleep(self.delay)
+                # Analyse hors de la boucle d'événements (thread ou processus)
+                parsed = await loop.run_in_executor(
+                    self._parser_pool, self.parser.parse, content, content_type
+                )
                 
-                # Récupérer la page
-                response = requests.get(url, headers=self.headers, timeout=10)
-                response.raise_for_status()
-                
-                # Marquer comme visitée
-                self.visited.add(url)
-                
-                # Extraire les données
-                html = response.text
-                text = self.extract_text(html)
-                links = self.get_links(url, html)
+                self.visited.add(key)
+                record, links = self._process_page(url, content, parsed)
+                del content
+                save(record)
                 
-                # Sauvegarder les données
-                pages_data.append({
-                    'url': url,
-                    'title': BeautifulSoup(html, 'html.parser').title.string if BeautifulSoup(html, 'html.parser').title else 'No title',
-                    'text_length': len(text),
-                    'links_found': len(links)
-                })
-                
-                # Ajouter les nouveaux liens à visiter
                 for link in links:
-                    if link not in self.visited and link not in self.to_visit:
-                        self.to_visit.append(link)
+                    canonical = canonicalize_url(link)
+                    if canonical not in self.seen:
+                        self.seen.add(canonical)
+                        pending.add(link)
+                        queue.put_nowait(link)
+                
+                if len(self.visited) % self.checkpoint_every == 0:
+                    flush()
+                    self._save_checkpoint(pending=pending - {url})
                 
-                print(f"   ✓ Trouvé {len(links)} liens | Texte: {len(text)} caractères")
+                self._log_page(url, record, links)
                 
-            except requests.RequestException as e:
-                print(f"   ✗ Erreur: {e}")
+            except (aiohttp.ClientError, asyncio.TimeoutError, PageTooLargeError, RateLimitedError) as e:
+                claimed -= 1
+                self._log.warning("   ✗ Erreur (%s): %s", url, e)
             except Exception as e:
-                print(f"   ✗ Erreur inattendue: {e}")
+                claimed -= 1
+                self._log.warning("   ✗ Erreur inattendue (%s): %s", url, e)
         
-        print(f"\n✅ Crawling terminé!")
-        print(f"📊 Pages visitées: {len(self.visited)}")
-        print(f"📋 Pages en attente: {len(self.to_visit)}")
+        async def worker(session):
+            while True:
+                url = await queue.get()
+                try:
+                    await fetch(session, url)
+                    # Pas en cas d'annulation: l'URL reste dans le checkpoint
+                    pending.discard(url)
+                finally:
+                    queue.task_done()
+        
+        # Résolveur asynchrone (aiodns) s'il est installé, et cache DNS de 5 min
+        try:
+            resolver = aiohttp.AsyncResolver()
+        except (ImportError, RuntimeError):
+            resolver = None
+        # Toutes les URLs sont sur le même domaine: `concurrency` connexions
+        connector = aiohttp.TCPConnector(
+            limit=concurrency, limit_per_host=concurrency,
+            use_dns_cache=True, ttl_dns_cache=300, resolver=resolver
+        )
+        timeout = aiohttp.ClientTimeout(total=10)
+        with self._parsing_pool(), _page_sink(out_path, pages_data) as (save, flush):
+            try:
+                async with aiohttp.ClientSession(
+                    connector=connector, headers=self.headers, timeout=timeout
+                ) as session:
+                    tasks = [asyncio.create_task(worker(session)) for _ in range(workers)]
+                    try:
+                        # La file est vide et plus aucun worker ne traite de page
+                        await queue.join()
+                    finally:
+                        for task in tasks:
+                            task.cancel()
+                        await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                # Aussi après une interruption (Ctrl-C, annulation)
+                flush()
+                self._save_checkpoint(pending=pending)
+        
+        self._log_summary()
         
         return pages_data
+    
+    def _log_page(self, url, record, links):
+        """Détail d'une page (DEBUG) et progression toutes les PROGRESS_EVERY pages"""
+        if record['duplicate']:
+            self._log.debug("   ≈ %s: quasi-doublon d'une page déjà vue, liens ignorés", url)
+        else:
+            self._log.debug("   ✓ %s: %d liens | Texte: %d caractères", url, len(links), record['text_length'])
+        
+        if len(self.visited) % PROGRESS_EVERY == 0:
+            self._log.info("📈 %d/%d pages visitées | %d en attente",
+                           len(self.visited), self.max_pages, len(self.to_visit))
+    
+    def _log_summary(self):
+        self._log.info("\n✅ Crawling terminé!")
+        self._log.info("📊 Pages visitées: %d", len(self.visited))
+        self._log.info("📋 Pages en attente: %d", len(self.to_visit))
+    
+    def _save_checkpoint(self, pending=()):
+        """Sauvegarde l'état du crawl dans checkpoint_path (si défini)
+        
+        Écriture dans un fichier temporaire puis renommage: une interruption
+        pendant la sauvegarde ne corrompt jamais le checkpoint précédent.
+        
+        Args:
+            pending: URLs retirées de to_visit mais pas encore visitées
+        """
+        if not self.checkpoint_path:
+            return
+        
+        state = {
+            'to_visit': list(pending) + list(self.to_visit),
+            'visited': self.visited,
+            'seen': self.seen,
+            'fingerprints': self.fingerprints,
+        }
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def _load_checkpoint(self):
+        """Recharge l'état sauvegardé par _save_checkpoint()"""
+        with open(self.checkpoint_path, 'rb') as f:
+            state = pickle.load(f)
+        
+        self.to_visit = deque(state['to_visit'])
+        self.visited = state['visited']
+        self.seen = state['seen']
+        self.fingerprints = state['fingerprints']
+        self._log.info("♻️  Reprise depuis %s: %d pages visitées, %d en attente",
+                       self.checkpoint_path, len(self.visited), len(self.to_visit))
+    
+    @contextmanager
+    def _parsing_pool(self):
+        """Démarre les `parse_workers` processus d'analyse le temps d'un crawl"""
+        if not self.parse_workers:
+            yield
+            return
+        
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            self._parser_pool = pool
+            try:
+                yield
+            finally:
+                self._parser_pool = None
+    
+    def _download_and_parse(self, url):
+        """Télécharge puis analyse la page
+        
+        Appelée depuis les threads de crawl(). L'analyse (CPU) part dans le
+        pool de processus s'il existe, pour ne pas être limitée par le GIL.
+        
+        Returns:
+            (content, parsed): le contenu brut (pour les liens) et le résultat
+            de PageParser.parse()
+        """
+        content, content_type = self._fetch(url)
+        if self._parser_pool is None:
+            return content, self.parser.parse(content, content_type)
+        return content, self._parser_pool.submit(self.parser.parse, content, content_type).result()
+    
+    def _fetch(self, url):
+        """Télécharge une page par morceaux
+        
+        Attend son tour pour l'hôte de l'URL avant chaque requête, et retente
+        les réponses 429/503. Le téléchargement est interrompu dès que la page
+        dépasse MAX_PAGE_BYTES, sans avoir gardé toute la réponse en mémoire.
+        
+        Returns:
+            (content, content_type): le contenu brut (bytes) et l'en-tête Content-Type
+        """
+        host = urlparse(url).netloc
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.acquire(host)
+            with self.session.get(url, stream=True, timeout=10) as response:
+                self.limiter.update(host, response.status_code, response.headers)
+                if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+                    self._log.debug("   ↻ %s: status %d, nouvel essai", url, response.status_code)
+                    continue
+                response.raise_for_status()
+                
+                length = response.headers.get('Content-Length')
+                if length and length.isdigit() and int(length) > MAX_PAGE_BYTES:
+                    raise PageTooLargeError(f"{url} dépasse {MAX_PAGE_BYTES} octets")
+                
+                content = bytearray()
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    content += chunk
+                    if len(content) > MAX_PAGE_BYTES:
+                        raise PageTooLargeError(f"{url} dépasse {MAX_PAGE_BYTES} octets")
+            
+            return bytes(content), response.headers.get('Content-Type')
+    
+    def _process_page(self, url, content, parsed):
+        """Construit l'enregistrement d'une page analysée par PageParser.parse()
+        
+        Returns:
+            (record, links): les informations de la page et ses liens à suivre
+        """
+        title, text_length, fingerprint = parsed
+        
+        # Page quasi identique à une page déjà vue (miroir, paramètres de
+        # session...): on ne suit pas ses liens, inutile de les extraire
+        duplicate = fingerprint is not None and self.fingerprints.find_near(fingerprint)
+        if duplicate:
+            links = []
+        else:
+            if fingerprint is not None:
+                self.fingerprints.add(fingerprint)
+            links = self.parser.extract_links(url, content)
+        
+        record = {
+            'url': url,
+            'title': title,
+            'text_length': text_length,
+            'links_found': len(links),
+            'duplicate': duplicate
+        }
+        return record, links
+
+
+class PageParser:
+    """Analyse d'une page: titre, texte, empreinte SimHash et liens internes
+    
+    Ne dépend d'aucun état du crawler: les objets PageParser peuvent être
+    envoyés (pickle) à des processus séparés.
+    """
+    
+    # Extraction rapide des liens directement sur les octets de la page.
+    # Compromis assumé: les href sans guillemets, la balise <base> et les
+    # liens générés en JavaScript sont ignorés, et un <a href> placé dans un
+    # commentaire ou un script est pris pour un vrai lien. Le nom d'attribut
+    # doit suivre un espace: data-href ou xhref ne passent pas pour href.
+    _HREF_RE = re.compile(rb'<a\s(?:[^>]*?\s)?href\s*=\s*["\']([^"\'>\s]+)', re.IGNORECASE)
+    
+    def __init__(self, domain):
+        """
+        Args:
+            domain: Domaine (netloc) auquel les liens doivent appartenir
+        """
+        self.domain = domain
+        self._allowed_prefixes = (f'http://{domain}', f'https://{domain}')
+    
+    def is_valid_url(self, url):
+        """Vérifie si l'URL est valide et appartient au même domaine"""
+        # Cas courant: simple comparaison de préfixe, sans analyser l'URL
+        for prefix in self._allowed_prefixes:
+            if url.startswith(prefix):
+                return len(url) == len(prefix) or url[len(prefix)] in '/?#'
+        if self.domain not in url:
+            return False
+        
+        # Cas rares (schéma en majuscules, identifiants...): analyse complète
+        parsed = urlparse(url)
+        return (
+            bool(parsed.netloc) and 
+            bool(parsed.scheme) and
+            parsed.netloc == self.domain
+        )
+    
+    def extract_links(self, url, content):
+        """Extrait tous les liens d'une page à partir de ses octets bruts
+        
+        Pas d'arbre HTML ici, seulement _HREF_RE (voir ses limites).
+        """
+        links = []
+        seen_hrefs = set()  # menus et pieds de page répètent les mêmes liens
+        # Découpage de l'URL de la page une seule fois, pour tous ses liens
+        base = urlparse(url)
+        origin = f"{base.scheme}://{base.netloc}"
+        
+        for match in self._HREF_RE.finditer(content):
+            # Lien déjà vu sur cette page: ni décodage ni jointure
+            raw_href = match.group(1)
+            if raw_href in seen_hrefs:
+                continue
+            seen_hrefs.add(raw_href)
+            
+            href = html_lib.unescape(raw_href.decode('utf-8', 'ignore'))
+            # Ancres, javascript:, mailto:, tel: ne mènent à aucune page
+            if _SKIPPED_HREF_RE.match(href):
+                continue
+            
+            if _SCHEME_RE.match(href) or href.startswith('//'):
+                # Lien absolu: un autre domaine est écarté avant toute jointure
+                if self.domain not in href:
+                    continue
+                absolute_url = _fast_join(url, base.scheme, origin, href)
+                if not self.is_valid_url(absolute_url):
+                    continue
+            else:
+                # Un lien relatif reste sur le domaine de la page: pas de vérification
+                absolute_url = _fast_join(url, base.scheme, origin, href)
+            links.append(absolute_url)
+        
+        return links
+    
+    def extract_text(self, doc):
+        """Extrait le texte principal d'une page déjà analysée
+        
+        Attention: modifie `doc` (les scripts, styles et commentaires sont
+        supprimés).
+        """
+        # Supprimer scripts, styles et commentaires en une seule passe C
+        # (le texte qui les suit est conservé)
+        etree.strip_elements(doc, 'script', 'style', etree.Comment, with_tail=False)
+        
+        # Extraire le texte (un espace entre chaque élément)
+        text = ' '.join(doc.itertext())
+        # Nettoyer les espaces multiples (espaces, tabulations, retours à la ligne)
+        return _WS_RE.sub(' ', text).strip()
+    
+    def parse(self, content, content_type=None):
+        """Analyse une page téléchargée (titre, texte et empreinte)
+        
+        Les liens ne sont pas extraits ici: extract_links() n'est appelée
+        qu'une fois la page reconnue comme n'étant pas un quasi-doublon.
+        
+        Args:
+            content: Contenu brut de la page (bytes)
+            content_type: En-tête Content-Type de la réponse, s'il existe
+        
+        Returns:
+            (title, text_length, fingerprint)
+        """
+        # Une seule analyse du HTML, pour le titre et le texte (les liens sont
+        # extraits directement des octets); libxml2 décode lui-même la page
+        doc = parse_html(content, detect_encoding(content, content_type))
+        if doc is None:
+            title, text = 'No title', ''
+        else:
+            title = doc.findtext('.//title') or 'No title'
+            text = self.extract_text(doc)
+        
+        return title, len(text), simhash(text)
 
 
 class RobotsTxtChecker:
-    """Vérifie si le crawling est autorisé selon robots.txt"""
+    """Vérifie si le crawling est autorisé selon robots.txt
     
-    @staticmethod
-    def can_fetch(url, user_agent='*'):
+    Le robots.txt de chaque hôte n'est téléchargé et analysé qu'une seule
+    fois, puis gardé en cache (les `max_hosts` hôtes les plus récents).
+    """
+    
+    def __init__(self, session=None, max_hosts=128):
+        """
+        Args:
+            session: requests.Session optionnelle à réutiliser (keep-alive)
+            max_hosts: Nombre maximum d'hôtes gardés en cache
+        """
+        self.session = session or requests.Session()
+        self.max_hosts = max_hosts
+        self._parsers = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def can_fetch(self, url, user_agent='*'):
         """Vérifie si l'URL peut être crawlée selon robots.txt"""
         parsed = urlparse(url)
-        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        host = f"{parsed.scheme}://{parsed.netloc}"
+        
+        with self._lock:
+            parser = self._parsers.get(host)
+            if parser is not None:
+                self._parsers.move_to_end(host)
+        
+        if parser is None:
+            parser = self._load(host)
+            with self._lock:
+                self._parsers[host] = parser
+                if len(self._parsers) > self.max_hosts:
+                    self._parsers.popitem(last=False)
+        
+        return parser.can_fetch(user_agent, url)
+    
+    def _load(self, host):
+        """Télécharge et analyse le robots.txt d'un hôte"""
+        robots_url = f"{host}/robots.txt"
+        parser = RobotFileParser(robots_url)
         
         try:
-            response = requests.get(robots_url, timeout=5)
-            if response.status_code == 200:
-                print(f"\n📜 robots.txt trouvé à {robots_url}")
-                print("Première lignes:")
-                print(response.text[:500])
-                return True
-            else:
-                print(f"\n📜 Pas de robots.txt (status: {response.status_code})")
-                return True
+            response = self.session.get(robots_url, timeout=5)
         except requests.RequestException:
-            print(f"\n📜 Impossible d'accéder à robots.txt")
-            return True
+            logger.warning("📜 Impossible d'accéder à %s, tout est autorisé", robots_url)
+            parser.allow_all = True
+            return parser
+        
+        # Mêmes règles que RobotFileParser.read() (RFC 9309)
+        if response.status_code in (401, 403):
+            parser.disallow_all = True
+        elif 400 <= response.status_code < 500:
+            parser.allow_all = True
+        elif response.status_code >= 500:
+            parser.disallow_all = True
+        else:
+            parser.parse(response.text.splitlines())
+        
+        logger.info("📜 robots.txt chargé pour %s (status: %d)", host, response.status_code)
+        return parser
+
+
+class HostRateLimiter:
+    """Limite de débit par hôte (token bucket), partagée entre threads et coroutines
+    
+    Chaque hôte a un seau de `burst` jetons qui se remplit de `rate` jetons
+    par seconde; une requête consomme un jeton. Un hôte inactif peut donc
+    recevoir `burst` requêtes d'affilée, puis une toutes les 1/rate secondes.
+    
+    Le serveur peut ralentir le crawler: Retry-After (et les 429/503) bloque
+    l'hôte un moment, X-RateLimit-Remaining/X-RateLimit-Reset réduisent son
+    débit pour ne pas épuiser le quota avant la fin de la fenêtre.
+    """
+    
+    def __init__(self, rate, burst=1):
+        """
+        Args:
+            rate: Requêtes par seconde et par hôte (math.inf: pas de limite)
+            burst: Taille du seau (requêtes d'affilée pour un hôte inactif)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.rates = {}  # hôte -> débit imposé par le serveur
+        self._buckets = {}  # hôte -> [jetons, instant du dernier remplissage]
+        self._failures = {}  # hôte -> nombre de 429/503 consécutifs
+        self._lock = threading.Lock()
+    
+    def reserve(self, host):
+        """Réserve un jeton pour cet hôte
+        
+        Les jetons peuvent devenir négatifs: chaque appel réserve le créneau
+        suivant, quel que soit le nombre de threads ou de coroutines.
+        
+        Returns:
+            Le temps à attendre (en secondes) avant d'envoyer la requête
+            (time.sleep() dans un thread, asyncio.sleep() dans une coroutine)
+        """
+        with self._lock:
+            now = time.monotonic()
+            rate = self.rates.get(host, self.rate)
+            bucket = self._buckets.setdefault(host, [self.burst, now])
+            tokens, last_refill = bucket
+            # last_refill est dans le futur tant que l'hôte est bloqué
+            if now > last_refill:
+                if rate == math.inf:
+                    tokens = self.burst
+                else:
+                    tokens = min(self.burst, tokens + (now - last_refill) * rate)
+                last_refill = now
+            
+            tokens -= 1
+            bucket[:] = [tokens, last_refill]
+            wait = last_refill - now
+            if tokens < 0:
+                wait += -tokens / rate
+        return wait
+    
+    def acquire(self, host):
+        """Attend (dans le thread courant) qu'un jeton soit disponible"""
+        wait = self.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+    
+    def update(self, host, status, headers):
+        """Ajuste le débit de l'hôte d'après une réponse
+        
+        Les attentes demandées par le serveur sont limitées à MAX_BACKOFF: un
+        thread ou une coroutine ne reste jamais bloqué des heures (Ctrl-C).
+        
+        Args:
+            status: Code HTTP de la réponse
+            headers: En-têtes de la réponse (requests ou aiohttp)
+        
+        Raises:
+            RateLimitedError: Réponse 429/503 dont l'attente demandée dépasse
+                MAX_BACKOFF (l'URL est abandonnée au lieu d'attendre)
+        """
+        retry_after = self._parse_retry_after(headers.get('Retry-After'))
+        remaining, reset = self._parse_rate_limit(headers)
+        
+        with self._lock:
+            if status in RETRY_STATUSES:
+                failures = self._failures.get(host, 0) + 1
+                self._failures[host] = failures
+                if retry_after is None:
+                    retry_after = min(BACKOFF_BASE * 2 ** (failures - 1), MAX_BACKOFF)
+            else:
+                self._failures.pop(host, None)
+            
+            if remaining is not None and reset is not None:
+                if remaining <= 0:
+                    # Quota épuisé: plus rien avant la fin de la fenêtre
+                    retry_after = max(retry_after or 0, reset)
+                elif reset > 0:
+                    # Répartir les requêtes restantes sur la fenêtre (au moins
+                    # une requête toutes les MAX_BACKOFF secondes)
+                    self.rates[host] = min(self.rate, max(remaining / reset, 1 / MAX_BACKOFF))
+                else:
+                    self.rates.pop(host, None)
+            
+            if retry_after:
+                self._block(host, min(retry_after, MAX_BACKOFF))
+        
+        if status in RETRY_STATUSES and retry_after and retry_after > MAX_BACKOFF:
+            raise RateLimitedError(f"{host} demande d'attendre {retry_after:.0f} s")
+    
+    def _block(self, host, seconds):
+        """Aucune requête vers cet hôte pendant `seconds` secondes (verrou déjà pris)"""
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(host, [self.burst, now])
+        # Une seule requête à la reprise, puis le débit normal
+        bucket[:] = [min(bucket[0], 1), max(bucket[1], now + seconds)]
+    
+    @staticmethod
+    def _parse_retry_after(value):
+        """Retry-After: un nombre de secondes ou une date HTTP"""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    
+    @staticmethod
+    def _parse_rate_limit(headers):
+        """X-RateLimit-Remaining et X-RateLimit-Reset
+        
+        Returns:
+            (remaining, reset): requêtes restantes et secondes avant la fin de
+            la fenêtre, ou None pour les en-têtes absents ou invalides
+        """
+        try:
+            remaining = int(headers.get('X-RateLimit-Remaining'))
+        except (TypeError, ValueError):
+            remaining = None
+        try:
+            reset = float(headers.get('X-RateLimit-Reset'))
+        except (TypeError, ValueError):
+            return remaining, None
+        # Selon les serveurs: secondes restantes ou instant Unix de fin de fenêtre
+        if reset > 1e9:
+            reset -= time.time()
+        return remaining, max(0.0, reset)
+
+
+class PinnedDNSAdapter(HTTPAdapter):
+    """HTTPAdapter qui se connecte à une IP résolue à l'avance pour un hôte
+    
+    Les requêtes vers `host` ne refont pas de résolution DNS à chaque
+    nouvelle connexion. Le nom d'hôte reste utilisé pour l'en-tête Host,
+    le SNI et la vérification du certificat TLS.
+    """
+    
+    def __init__(self, host, ip, **kwargs):
+        self.host = host
+        self.ip = ip
+        super().__init__(**kwargs)
+    
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        if host_params['host'] == self.host:
+            host_params['host'] = self.ip
+            if host_params['scheme'] == 'https':
+                pool_kwargs['server_hostname'] = self.host
+                pool_kwargs['assert_hostname'] = self.host
+        return host_params, pool_kwargs
+    
+    def send(self, request, **kwargs):
+        # En-tête Host ajouté sur une copie: requests réutilise la requête
+        # d'origine pour suivre les redirections (éventuellement vers un autre hôte)
+        parsed = urlparse(request.url)
+        if parsed.hostname == self.host and 'Host' not in request.headers:
+            request = request.copy()
+            request.headers['Host'] = parsed.netloc
+        return super().send(request, **kwargs)
+
+
+class BloomFilter:
+    """Ensemble probabiliste à mémoire fixe (filtre de Bloom)
+    
+    `x in filtre` ne donne jamais de faux négatif, mais peut donner un faux
+    positif avec une probabilité proche de `error_rate` tant que le nombre
+    d'éléments reste sous `capacity`: une URL nouvelle peut alors être
+    considérée à tort comme déjà vue.
+    """
+    
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        Args:
+            capacity: Nombre d'éléments prévu
+            error_rate: Taux de faux positifs visé
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item):
+        """Positions des bits de l'élément (double hachage)"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+    
+    def __len__(self):
+        return self.count
+
+
+class SimhashIndex:
+    """Index d'empreintes SimHash pour trouver les quasi-doublons
+    
+    L'empreinte est découpée en `max_distance + 1` blocs: deux empreintes à
+    distance <= max_distance ont forcément au moins un bloc identique, on ne
+    compare donc qu'aux empreintes qui partagent un bloc (au lieu de toutes).
+    """
+    
+    def __init__(self, max_distance=3, bits=64):
+        self.max_distance = max_distance
+        self.bits = bits
+        self.block_size = math.ceil(bits / (max_distance + 1))
+        self.buckets = {}
+    
+    def _keys(self, fingerprint):
+        mask = (1 << self.block_size) - 1
+        for i in range(self.max_distance + 1):
+            yield i, fingerprint >> (i * self.block_size) & mask
+    
+    def find_near(self, fingerprint):
+        """Indique si une empreinte proche a déjà été ajoutée"""
+        for key in self._keys(fingerprint):
+            for other in self.buckets.get(key, ()):
+                if bin(fingerprint ^ other).count('1') <= self.max_distance:
+                    return True
+        return False
+    
+    def add(self, fingerprint):
+        for key in self._keys(fingerprint):
+            self.buckets.setdefault(key, []).append(fingerprint)
 
 
 # ============================================================================
@@ -178,17 +1248,18 @@ def exemple_1_crawl_basique():
     # Site d'exemple (remplacer par un site que vous avez la permission de crawler)
     url = "https://example.com"
     
-    # Vérifier robots.txt
-    RobotsTxtChecker.can_fetch(url)
-    
-    # Créer et lancer le crawler
-    crawler = SimpleCrawler(
+    # Créer et lancer le crawler (messages du crawler affichés sur la console)
+    with console_logging(), SimpleCrawler(
         start_url=url,
         max_pages=5,
         delay=1  # 1 seconde entre chaque requête
-    )
-    
-    data = crawler.crawl()
+    ) as crawler:
+        # Vérifier robots.txt (en réutilisant la connexion du crawler)
+        if not crawler.robots.can_fetch(url, crawler.headers['User-Agent']):
+            print("⛔ robots.txt interdit le crawling de cette URL")
+            return
+        
+        data = crawler.crawl()
     
     # Afficher les résultats
     print("\n📊 RÉSULTATS:")
@@ -209,7 +1280,7 @@ def exemple_2_extraction_specifique():
     
     try:
         response = requests.get(url, timeout=10)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.text, HTML_PARSER)
         
         # Extraire tous les titres
         print("\n📌 TITRES (h1, h2, h3):")
@@ -237,14 +1308,21 @@ def exemple_3_sitemap_generator():
     print("=" * 70)
     
     url = "https://example.com"
-    crawler = SimpleCrawler(start_url=url, max_pages=10, delay=1)
-    data = crawler.crawl()
+    # Les pages sont écrites dans pages.jsonl au fur et à mesure du crawl.
+    # Le fichier est complété (mode ajout, pour les crawls repris): on
+    # repart d'un fichier vide pour ne pas relire les pages des exécutions précédentes
+    if os.path.exists('pages.jsonl'):
+        os.remove('pages.jsonl')
+    with console_logging(), SimpleCrawler(start_url=url, max_pages=10, delay=1) as crawler:
+        crawler.crawl(out_path='pages.jsonl')
     
-    # Générer un sitemap simple
+    # Générer un sitemap simple en relisant le fichier ligne par ligne
     sitemap = "SITEMAP\n" + "=" * 50 + "\n\n"
-    for page in data:
-        sitemap += f"• {page['title']}\n"
-        sitemap += f"  {page['url']}\n\n"
+    with open('pages.jsonl', encoding='utf-8') as f:
+        for line in f:
+            page = json.loads(line)
+            sitemap += f"• {page['title']}\n"
+            sitemap += f"  {page['url']}\n\n"
     
     print(sitemap)
     
@@ -254,6 +1332,21 @@ def exemple_3_sitemap_generator():
     print("💾 Sitemap sauvegardé dans sitemap.txt")
 
 
+def exemple_4_crawl_asynchrone():
+    """Exemple 4: Crawl asynchrone avec plusieurs requêtes en parallèle"""
+    print("\n" + "=" * 70)
+    print("EXEMPLE 4: Crawl asynchrone (asyncio + aiohttp)")
+    print("=" * 70)
+    
+    url = "https://example.com"
+    with console_logging(), SimpleCrawler(start_url=url, max_pages=10, delay=1) as crawler:
+        data = asyncio.run(crawler.crawl_async(concurrency=16))
+    
+    print(f"\n📊 {len(data)} pages récupérées")
+    for page in data:
+        print(f"   • {page['title']} -> {page['url']}")
+
+
 if __name__ == "__main__":
     print("""
 ╔════════════════════════════════════════════════════════════════╗
@@ -266,10 +1359,11 @@ if __name__ == "__main__":
    • Utilisez des délais raisonnables entre les requêtes
    • Identifiez votre crawler avec un User-Agent approprié
 
-📚 Ce script contient 3 exemples:
+📚 Ce script contient 4 exemples:
    1. Crawl basique d'un site
    2. Extraction d'informations spécifiques
    3. Génération d'un sitemap
+   4. Crawl asynchrone (requêtes en parallèle)
 
 Décommentez l'exemple que vous souhaitez exécuter ci-dessous:
 """)
@@ -278,9 +1372,11 @@ Décommentez l'exemple que vous souhaitez exécuter ci-dessous:
     # exemple_1_crawl_basique()
     # exemple_2_extraction_specifique()
     # exemple_3_sitemap_generator()
+    # exemple_4_crawl_asynchrone()
     
     print("\n💡 Pour utiliser ce script:")
-    print("   1. Installez les dépendances: pip install requests beautifulsoup4")
+    print("   1. Installez les dépendances: pip install requests beautifulsoup4 lxml")
+    print("      (exemple 4: pip install aiohttp)")
     print("   2. Décommentez un exemple dans la section __main__")
     print("   3. Remplacez l'URL par un site que vous pouvez crawler légalement")
     print("   4. Exécutez: python web_crawler_educatif.py")